@@ -1,8 +1,10 @@
+import sys
 from dataclasses import dataclass
-from typing import Dict
+from types import MappingProxyType
+from typing import Mapping
 
 
-@dataclass
+@dataclass(slots=True)
 class Character:
     """Represents an AI character for role-play."""
     id: str
@@ -14,7 +16,7 @@ class Character:
     pitch: float = 0.0
 
 
-CHARACTERS: Dict[str, Character] = {
+CHARACTERS: Mapping[str, Character] = MappingProxyType({
     "buyer": Character(
         id="buyer",
         name="Operations Manager",
@@ -73,21 +75,30 @@ BEHAVIOR INSTRUCTIONS:
         speaking_rate=1.0,
         pitch=0.0,
     ),
-}
+})
+
+# Intern the large prompts so every session passes around the same object
+for _char in CHARACTERS.values():
+    _char.system_prompt = sys.intern(_char.system_prompt)
+
+_DEFAULT_CHARACTER = CHARACTERS["buyer"]
 
 
 def get_character(character_id: str) -> Character:
     """Get a character by ID, or return a default if not found."""
-    return CHARACTERS.get(character_id, CHARACTERS["buyer"])
+    return CHARACTERS.get(character_id, _DEFAULT_CHARACTER)
+
+
+_CHARACTERS_LIST = tuple(
+    {
+        "id": char.id,
+        "name": char.name,
+        "description": char.description,
+    }
+    for char in CHARACTERS.values()
+)
 
 
-def list_characters() -> list:
+def list_characters() -> tuple:
     """List all available characters."""
-    return [
-        {
-            "id": char.id,
-            "name": char.name,
-            "description": char.description,
-        }
-        for char in CHARACTERS.values()
-    ]
+    return _CHARACTERS_LIST
@@ -1,7 +1,11 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+# Parse .env only once per process tree; reloader/worker re-imports reuse the
+# values already present in os.environ
+if not os.environ.get("_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_DOTENV_LOADED"] = "1"
 
 # Google Cloud credentials
 GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -13,10 +17,36 @@ SAMPLE_RATE = 16000  # Hz - Google Speech-to-Text works best with 16kHz
 CHANNELS = 1  # Mono audio
 CHUNK_SIZE = 4096  # Bytes per audio chunk
 
+# Voice activity detection (end-of-turn) settings
+VAD_AGGRESSIVENESS = 2  # 0 (least) to 3 (most aggressive at filtering non-speech)
+VAD_FRAME_MS = 30  # webrtcvad accepts 10, 20 or 30 ms frames
+VAD_SILENCE_MS = 500  # Silence after speech that ends the user's turn
+VAD_PREROLL_MS = 300  # Audio kept before the first detected speech
+
 # Speech-to-Text settings
 STT_LANGUAGE_CODE = "en-US"
 STT_MODEL = "latest_long"  # Good for conversations
+STT_MIN_SEND_BYTES = 3200  # ~100 ms of 16 kHz 16-bit mono audio per streaming request
+STT_MAX_BATCH_WAIT = 0.05  # Seconds to wait for more audio before sending a partial batch
+STT_MAX_BUFFER_BYTES = SAMPLE_RATE * 2 * 5  # Unsent audio kept when STT falls behind (~5 s)
+STT_INTERIM_MIN_INTERVAL = 0.1  # Seconds between interim transcript updates
 
 # Text-to-Speech settings
 TTS_LANGUAGE_CODE = "en-US"
-TTS_AUDIO_ENCODING = "MP3"
+TTS_AUDIO_ENCODING = "OGG_OPUS"
+
+# gRPC channel settings for Google clients
+GRPC_CHANNEL_POOL_SIZE = 4  # Channels per client type, used round-robin across sessions
+GRPC_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),  # Keep idle connections warm
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.use_local_subchannel_pool", 1),  # Give each pooled channel its own connection
+    ("grpc.max_send_message_length", -1),
+    ("grpc.max_receive_message_length", -1),
+]
+
+# Worker threads for blocking Google API calls (Gemini, STT, TTS); size for the
+# number of concurrent sessions expected
+THREAD_POOL_WORKERS = int(os.getenv("STT_TTS_POOL", 64))
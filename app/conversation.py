@@ -1,8 +1,9 @@
 import asyncio
+import inspect
+import time
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Optional, Callable, List
-from datetime import datetime
+from typing import Optional, Callable, List, Awaitable
 
 
 class ConversationState(Enum):
@@ -13,12 +14,12 @@ class ConversationState(Enum):
     SPEAKING = "speaking"
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationTurn:
     """Represents a single turn in the conversation."""
     role: str  # "user" or "assistant"
     text: str
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp_ms: int = field(default_factory=lambda: time.time_ns() // 1_000_000)  # Unix epoch ms
 
 
 class ConversationManager:
@@ -30,29 +31,40 @@ class ConversationManager:
     def __init__(self):
         self.state = ConversationState.IDLE
         self.history: List[ConversationTurn] = []
+        self._display_cache: List[dict] = []
         self.current_transcript = ""
         self.is_interrupted = False
-        self._state_callbacks: List[Callable[[ConversationState], None]] = []
-        self._lock = asyncio.Lock()
+        self._sync_cbs: List[Callable[[ConversationState], None]] = []
+        self._async_cbs: List[Callable[[ConversationState], Awaitable[None]]] = []
+        self._response_task: Optional[asyncio.Task] = None
+        self.response_cancelled = False
 
     async def set_state(self, new_state: ConversationState):
         """Change conversation state and notify listeners."""
-        async with self._lock:
-            old_state = self.state
-            self.state = new_state
-
-            for callback in self._state_callbacks:
-                try:
-                    if asyncio.iscoroutinefunction(callback):
-                        await callback(new_state)
-                    else:
-                        callback(new_state)
-                except Exception:
-                    pass
+        # All callers run on the event loop thread, so a plain assignment is
+        # already atomic with respect to other coroutines
+        self.state = new_state
+
+        for callback in self._sync_cbs:
+            try:
+                callback(new_state)
+            except Exception:
+                pass
+
+        # Async listeners are independent, so run them concurrently
+        if self._async_cbs:
+            await asyncio.gather(
+                *(callback(new_state) for callback in self._async_cbs),
+                return_exceptions=True,
+            )
 
     def on_state_change(self, callback: Callable[[ConversationState], None]):
         """Register a callback for state changes."""
-        self._state_callbacks.append(callback)
+        # Classify once here so set_state never has to introspect callbacks
+        if inspect.iscoroutinefunction(callback):
+            self._async_cbs.append(callback)
+        else:
+            self._sync_cbs.append(callback)
 
     async def start_listening(self):
         """Transition to listening state."""
@@ -64,7 +76,7 @@ class ConversationManager:
         self.current_transcript = text
 
         if is_final and text.strip():
-            self.history.append(ConversationTurn(role="user", text=text))
+            self._add_turn("user", text)
             await self.set_state(ConversationState.PROCESSING)
 
     async def start_speaking(self):
@@ -74,12 +86,30 @@ class ConversationManager:
 
     async def add_response(self, text: str):
         """Add assistant's response to history."""
-        self.history.append(ConversationTurn(role="assistant", text=text))
+        self._add_turn("assistant", text)
+
+    def _add_turn(self, role: str, text: str):
+        """Append a turn to history along with its display form."""
+        turn = ConversationTurn(role=role, text=text)
+        self.history.append(turn)
+        self._display_cache.append({
+            "role": turn.role,
+            "text": turn.text,
+            "timestamp": turn.timestamp_ms,
+        })
+
+    def track_response(self, task: Optional[asyncio.Task]):
+        """Set the in-flight response generation task to cancel on interruption."""
+        self._response_task = task
+        self.response_cancelled = False
 
     async def interrupt(self):
         """Handle user interruption during AI speech."""
         if self.state == ConversationState.SPEAKING:
             self.is_interrupted = True
+            if self._response_task is not None:
+                self._response_task.cancel()
+                self.response_cancelled = True
             await self.set_state(ConversationState.LISTENING)
             return True
         return False
@@ -96,16 +126,10 @@ class ConversationManager:
 
     def get_history_for_display(self) -> List[dict]:
         """Get conversation history formatted for display."""
-        return [
-            {
-                "role": turn.role,
-                "text": turn.text,
-                "timestamp": turn.timestamp.isoformat(),
-            }
-            for turn in self.history
-        ]
+        return list(self._display_cache)
 
     def clear_history(self):
         """Clear conversation history."""
         self.history = []
+        self._display_cache = []
         self.current_transcript = ""
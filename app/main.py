@@ -1,16 +1,29 @@
 import asyncio
-import json
-import base64
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse
-
-from app.services.speech_to_text import SimpleStreamingSTT
-from app.services.text_to_speech import TextToSpeech
-from app.services.gemini import GeminiChat
+from fastapi.responses import Response
+from google.cloud import speech
+import google.generativeai as genai
+
+from app.services.speech_to_text import SimpleStreamingSTT, sync_stt_client
+from app.services.text_to_speech import AsyncTextToSpeech, SENTENCE_BOUNDARY
+from app.services.gemini import GeminiChat, GEMINI_MODEL
+from app.config import (
+    THREAD_POOL_WORKERS,
+    SAMPLE_RATE,
+    STT_LANGUAGE_CODE,
+    VAD_AGGRESSIVENESS,
+    VAD_FRAME_MS,
+    VAD_SILENCE_MS,
+    VAD_PREROLL_MS,
+)
 from app.characters import get_character, list_characters, Character
 from app.conversation import ConversationManager, ConversationState
 
@@ -18,12 +31,106 @@ from app.conversation import ConversationManager, ConversationState
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Role-Play Demo")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Size the default executor used for blocking Google API calls."""
+    executor = ThreadPoolExecutor(max_workers=THREAD_POOL_WORKERS, thread_name_prefix="gcp-io")
+    asyncio.get_running_loop().set_default_executor(executor)
+    yield
+    executor.shutdown(wait=False)
+
+
+app = FastAPI(title="Role-Play Demo", lifespan=lifespan)
 
 # Mount static files and templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# Server-side audio uploads are 16 kHz 16-bit mono PCM, the format WebRTC VAD
+# and the streaming STT service expect. The browser currently uses the Web
+# Speech API and uploads no audio, so this path is dormant.
+_STT_CONFIG = speech.RecognitionConfig(
+    encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+    sample_rate_hertz=SAMPLE_RATE,
+    language_code=STT_LANGUAGE_CODE,
+    enable_automatic_punctuation=True,
+)
+
+# Voice activity detection over 16-bit mono PCM frames, used to end a turn as
+# soon as the user stops talking
+_VAD_FRAME_BYTES = SAMPLE_RATE * VAD_FRAME_MS // 1000 * 2
+_VAD_SILENCE_FRAMES = VAD_SILENCE_MS // VAD_FRAME_MS
+_VAD_PREROLL_BYTES = VAD_PREROLL_MS // VAD_FRAME_MS * _VAD_FRAME_BYTES
+
+
+@lru_cache(maxsize=1)
+def _get_vad():
+    """Load the optional WebRTC VAD on first use; None if it isn't installed."""
+    try:
+        import webrtcvad
+    except ImportError:
+        logger.warning("webrtcvad not installed; ending turns after a fixed amount of audio")
+        return None
+    return webrtcvad.Vad(VAD_AGGRESSIVENESS)
+
+
+# Binary WebSocket frames start with a one-byte type tag; the rest is payload
+_AUDIO_FRAME_TAG = b"\x01"
+
+# State and interrupt messages never vary, so serialize them once
+_STATE_FRAMES = {
+    state.value: orjson.dumps({"type": "state", "state": state.value}).decode()
+    for state in ConversationState
+}
+_INTERRUPTED_FRAME = orjson.dumps({"type": "interrupted"}).decode()
+
+# Shared across sessions so its audio cache serves repeated lines for everyone
+_TTS = AsyncTextToSpeech()
+
+# One-shot assessments share a single model instead of building a chat per stop
+_ASSESSMENT_MODEL = genai.GenerativeModel(
+    model_name=GEMINI_MODEL,
+    system_instruction="You are an expert sales coach providing constructive feedback.",
+)
+
+_ROLE_LABEL = {"user": "Seller", "assistant": "Buyer"}
+
+_ASSESSMENT_PROMPT_TEMPLATE = """You are a sales coach evaluating a student's value-based selling practice session.
+
+The student was practicing selling to a buyer (Operations Manager at a cleaning services company who currently uses metal paper clips).
+
+Here is the conversation transcript:
+---
+{transcript}
+---
+
+Please provide a coaching assessment with the following sections:
+
+1. **Overall Score**: Rate the pitch from 1-10
+
+2. **Summary**: Brief 2-3 sentence summary of how the conversation went
+
+3. **Strongest Points**:
+   - List 2-3 things the student did well
+   - Be specific with examples from the conversation
+
+4. **Areas for Improvement**:
+   - List 2-3 things the student could improve
+   - Provide specific suggestions
+
+5. **Key Opportunities Missed**:
+   - Did the student uncover the buyer's pain points? (rust issues, paper costs, shredder damage, employee injuries)
+   - Did they quantify the value/ROI?
+   - Did they ask open-ended questions?
+
+6. **One Key Tip**: The single most important thing to focus on next time
+
+Keep the feedback constructive and encouraging. Format it nicely for display."""
+
+# Character list is static, so encode the API payload once at import time
+_CHARACTERS_JSON = orjson.dumps(list_characters())
+
 
 @app.get("/")
 async def home(request: Request):
@@ -37,7 +144,7 @@ async def home(request: Request):
 @app.get("/api/characters")
 async def get_characters():
     """Get list of available characters."""
-    return JSONResponse(content=list_characters())
+    return Response(content=_CHARACTERS_JSON, media_type="application/json")
 
 
 class ConversationSession:
@@ -48,9 +155,13 @@ class ConversationSession:
         self.character = character
         self.manager = ConversationManager()
         self.gemini = GeminiChat(system_prompt=character.system_prompt)
-        self.tts = TextToSpeech()
+        self.tts = _TTS
         self.stt = SimpleStreamingSTT()
-        self._audio_buffer = []
+        self._audio_buffer = bytearray()
+        self._audio_chunks = 0
+        self._vad_offset = 0
+        self._heard_speech = False
+        self._silence_frames = 0
         self._is_running = False
         self._speech_timeout_task = None
         self._last_speech_time = None
@@ -60,43 +171,72 @@ class ConversationSession:
         message = {"type": msg_type}
         if data:
             message.update(data)
-        await self.websocket.send_json(message)
+        await self.websocket.send_text(orjson.dumps(message).decode())
+
+    async def send_state(self, state: str):
+        """Send a state change to the client using its pre-serialized frame."""
+        await self.websocket.send_text(_STATE_FRAMES[state])
 
     async def send_audio(self, audio_bytes: bytes):
-        """Send audio data to the client."""
-        audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
-        await self.send_message("audio", {"audio": audio_b64})
+        """Send audio data to the client as a tagged binary frame (no base64)."""
+        await self.websocket.send_bytes(_AUDIO_FRAME_TAG + audio_bytes)
 
     async def handle_audio_chunk(self, audio_data: bytes):
         """Handle incoming audio chunk from the client."""
         if self.manager.state == ConversationState.SPEAKING:
             # User is speaking while AI is talking - interrupt!
             await self.manager.interrupt()
-            await self.send_message("interrupted")
+            await self.websocket.send_text(_INTERRUPTED_FRAME)
             return
 
         if self.manager.state != ConversationState.LISTENING:
             return
 
-        self._audio_buffer.append(audio_data)
+        self._audio_buffer.extend(audio_data)
+        self._audio_chunks += 1
 
         # Log every 10th chunk to reduce noise
-        if len(self._audio_buffer) % 10 == 0:
-            logger.info(f"Audio buffer: {len(self._audio_buffer)} chunks")
+        if self._audio_chunks % 10 == 0:
+            logger.info(f"Audio buffer: {self._audio_chunks} chunks")
+
+        vad = _get_vad()
+        if vad is None:
+            # Without VAD, process after collecting ~3 seconds of audio
+            # (12 chunks at 250ms each)
+            turn_ended = self._audio_chunks >= 12
+        else:
+            # Run VAD over every complete frame not inspected yet
+            view = memoryview(self._audio_buffer)
+            while self._vad_offset + _VAD_FRAME_BYTES <= len(self._audio_buffer):
+                frame = bytes(view[self._vad_offset:self._vad_offset + _VAD_FRAME_BYTES])
+                self._vad_offset += _VAD_FRAME_BYTES
+                if vad.is_speech(frame, SAMPLE_RATE):
+                    self._heard_speech = True
+                    self._silence_frames = 0
+                else:
+                    self._silence_frames += 1
+            view.release()
+
+            if not self._heard_speech:
+                # Drop leading silence, keeping a short pre-roll for the first word
+                excess = self._vad_offset - _VAD_PREROLL_BYTES
+                if excess > 0:
+                    del self._audio_buffer[:excess]
+                    self._vad_offset -= excess
+                return
+
+            # Process as soon as the user pauses after speaking
+            turn_ended = self._silence_frames >= _VAD_SILENCE_FRAMES
 
-        # Process after collecting ~3 seconds of audio (12 chunks at 250ms each)
         # Only start processing task once, don't keep restarting it
-        if len(self._audio_buffer) >= 12 and self._speech_timeout_task is None:
-            logger.info(f"Starting speech processing task... (buffer={len(self._audio_buffer)}, task={self._speech_timeout_task})")
+        if turn_ended and self._speech_timeout_task is None:
+            logger.info(f"End of speech detected, starting processing (buffer={self._audio_chunks} chunks)")
             self._speech_timeout_task = asyncio.create_task(
                 self._process_and_reset()
             )
 
     async def _process_and_reset(self):
         """Process speech and reset for next turn."""
-        # Small delay to collect any final chunks
-        await asyncio.sleep(0.3)
-
         if self._audio_buffer and self.manager.state == ConversationState.LISTENING:
             await self._process_speech()
 
@@ -109,30 +249,27 @@ class ConversationSession:
             logger.info("No audio in buffer, skipping processing")
             return
 
-        # Combine audio chunks
-        combined_audio = b"".join(self._audio_buffer)
-        logger.info(f"Processing speech: {len(combined_audio)} bytes from {len(self._audio_buffer)} chunks")
-        self._audio_buffer = []
+        # Combine audio chunks; the protobuf API wants bytes, so copy once and reuse the buffer
+        combined_audio = bytes(self._audio_buffer)
+        logger.info(f"Processing speech: {len(combined_audio)} bytes from {self._audio_chunks} chunks")
+        self._audio_buffer.clear()
+        self._audio_chunks = 0
+        self._vad_offset = 0
+        self._heard_speech = False
+        self._silence_frames = 0
 
-        await self.send_message("state", {"state": "processing"})
+        await self.send_state("processing")
         await self.manager.set_state(ConversationState.PROCESSING)
 
         try:
             # For simplicity, using non-streaming STT here
             # In production, you'd use the streaming API
-            from google.cloud import speech
-
-            client = speech.SpeechClient()
             audio = speech.RecognitionAudio(content=combined_audio)
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-                sample_rate_hertz=48000,
-                language_code="en-US",
-                enable_automatic_punctuation=True,
-            )
 
             logger.info("Sending audio to Google Speech-to-Text...")
-            response = client.recognize(config=config, audio=audio)
+            response = await asyncio.to_thread(
+                sync_stt_client().recognize, config=_STT_CONFIG, audio=audio
+            )
             logger.info(f"Got {len(response.results)} results from STT")
 
             transcript = ""
@@ -147,72 +284,116 @@ class ConversationSession:
             else:
                 logger.info("Empty transcript, returning to listening")
                 await self.manager.set_state(ConversationState.LISTENING)
-                await self.send_message("state", {"state": "listening"})
+                await self.send_state("listening")
 
         except Exception as e:
             logger.error(f"Speech processing error: {e}")
             await self.send_message("error", {"message": str(e)})
             await self.manager.set_state(ConversationState.LISTENING)
-            await self.send_message("state", {"state": "listening"})
+            await self.send_state("listening")
 
     async def _generate_response(self, user_message: str):
         """Generate AI response and send as audio."""
         logger.info(f"Generating response for: '{user_message}'")
         await self.manager.update_transcript(user_message, is_final=True)
+        self.manager.is_interrupted = False
 
+        tts_tasks = []
         try:
-            # Get response from Gemini
+            # Get response from Gemini in its own task so an interruption can
+            # cancel generation immediately
             logger.info("Calling Gemini...")
-            full_response = ""
-            async for chunk in self.gemini.send_message_stream(user_message):
-                if self.manager.is_interrupted:
-                    break
-                full_response += chunk
-                await self.send_message("response_chunk", {"text": chunk})
-            logger.info(f"Gemini response: '{full_response[:100]}...' ({len(full_response)} chars)")
-
-            if self.manager.is_interrupted:
+            stream_task = asyncio.create_task(self._consume_stream(user_message, tts_tasks))
+            self.manager.track_response(stream_task)
+            try:
+                full_response = await stream_task
+            except asyncio.CancelledError:
+                # Only swallow the cancellation interrupt() issued for this turn
+                if not self.manager.response_cancelled:
+                    raise
+                logger.info("Response interrupted")
                 return
+            finally:
+                self.manager.track_response(None)
+            logger.info(f"Gemini response: '{full_response[:100]}...' ({len(full_response)} chars)")
 
             if full_response.strip():
                 await self.manager.add_response(full_response)
                 await self.send_message("response", {"text": full_response})
                 logger.info("Sent response text to client")
 
-                # Convert to speech
-                await self.manager.start_speaking()
-                await self.send_message("state", {"state": "speaking"})
-                logger.info("Starting TTS...")
-
-                audio_bytes = self.tts.synthesize(
-                    full_response,
-                    voice_name=self.character.voice_name,
-                    speaking_rate=self.character.speaking_rate,
-                    pitch=self.character.pitch,
-                )
-                logger.info(f"TTS complete: {len(audio_bytes)} bytes")
-
-                if not self.manager.is_interrupted:
-                    await self.send_audio(audio_bytes)
-                    logger.info("Audio sent to client")
+                await asyncio.gather(*tts_tasks)
+                logger.info("Audio sent to client")
 
                 await self.manager.finish_speaking()
 
-            await self.send_message("state", {"state": "listening"})
+            await self.send_state("listening")
             await self.manager.set_state(ConversationState.LISTENING)
             logger.info("Ready for next input")
 
         except Exception as e:
+            for task in tts_tasks:
+                task.cancel()
             logger.error(f"Error in _generate_response: {e}", exc_info=True)
             await self.send_message("error", {"message": str(e)})
             await self.manager.set_state(ConversationState.LISTENING)
-            await self.send_message("state", {"state": "listening"})
+            await self.send_state("listening")
+        finally:
+            # However the turn ended, including cancellation from outside,
+            # no sentence may keep synthesizing into a closed socket
+            for task in tts_tasks:
+                task.cancel()
+
+    async def _consume_stream(self, user_message: str, tts_tasks: list) -> str:
+        """Stream the Gemini reply, synthesizing each completed sentence while the rest is generated."""
+        full_response = ""
+        pending = ""
+        async for chunk in self.gemini.send_message_stream(user_message):
+            full_response += chunk
+            await self.send_message("response_chunk", {"text": chunk})
+
+            *sentences, pending = SENTENCE_BOUNDARY.split(pending + chunk)
+            for sentence in sentences:
+                await self._queue_sentence(sentence, tts_tasks)
+
+        await self._queue_sentence(pending, tts_tasks)
+        return full_response
+
+    async def _queue_sentence(self, sentence: str, tts_tasks: list):
+        """Start synthesizing a sentence, entering the speaking state on the first one."""
+        if not sentence.strip():
+            return
+
+        if not tts_tasks:
+            await self.manager.start_speaking()
+            await self.send_state("speaking")
+            logger.info("Starting TTS...")
+
+        previous = tts_tasks[-1] if tts_tasks else None
+        tts_tasks.append(asyncio.create_task(self._speak_sentence(sentence, previous)))
+
+    async def _speak_sentence(self, sentence: str, previous: asyncio.Task = None):
+        """Synthesize one sentence and send it once the previous sentence has been sent."""
+        audio_bytes = await self.tts.synthesize(
+            sentence,
+            voice_name=self.character.voice_name,
+            speaking_rate=self.character.speaking_rate,
+            pitch=self.character.pitch,
+        )
+        logger.info(f"TTS complete: {len(audio_bytes)} bytes")
+
+        # Synthesis runs concurrently, but audio must reach the client in order
+        if previous is not None:
+            await previous
+
+        if not self.manager.is_interrupted:
+            await self.send_audio(audio_bytes)
 
     async def start(self):
         """Start the conversation session."""
         self._is_running = True
         await self.manager.start_listening()
-        await self.send_message("state", {"state": "listening"})
+        await self.send_state("listening")
         await self.send_message("character", {
             "name": self.character.name,
             "description": self.character.description,
@@ -225,62 +406,75 @@ class ConversationSession:
             self._speech_timeout_task.cancel()
         await self.manager.stop()
 
-    async def generate_assessment(self):
-        """Generate a coaching assessment of the student's sales pitch."""
-        history = self.manager.get_history_for_display()
-
-        if len(history) < 2:
-            return None
+    async def handle_stop(self, data: dict) -> bool:
+        """Send the coaching assessment and stop the session."""
+        # Generate assessment before stopping
+        logger.info("Generating assessment...")
 
-        # Build conversation transcript
-        transcript = "\n".join([
-            f"{'Seller' if turn['role'] == 'user' else 'Buyer'}: {turn['text']}"
-            for turn in history
-        ])
+        assessment = await self.generate_assessment()
 
-        assessment_prompt = f"""You are a sales coach evaluating a student's value-based selling practice session.
+        if assessment:
+            await self.send_message("assessment", {"text": assessment})
+            logger.info("Assessment sent to client")
+        else:
+            # No assessment (not enough conversation)
+            await self.send_message("assessment", {"text": "Not enough conversation to generate an assessment. Try having a longer sales conversation next time!"})
 
-The student was practicing selling to a buyer (Operations Manager at a cleaning services company who currently uses metal paper clips).
+        await self.stop()
+        return True
 
-Here is the conversation transcript:
----
-{transcript}
----
-
-Please provide a coaching assessment with the following sections:
-
-1. **Overall Score**: Rate the pitch from 1-10
-
-2. **Summary**: Brief 2-3 sentence summary of how the conversation went
+    async def handle_change_character(self, data: dict) -> bool:
+        """Switch to another character and reset the chat."""
+        character = get_character(data.get("character_id"))
+        self.character = character
+        self.gemini.set_character(character.system_prompt)
+        await self.send_message("character", {
+            "name": character.name,
+            "description": character.description,
+        })
+        return False
 
-3. **Strongest Points**:
-   - List 2-3 things the student did well
-   - Be specific with examples from the conversation
+    async def handle_text_message(self, data: dict) -> bool:
+        """Generate a response to a typed or browser-transcribed message."""
+        text = data.get("text", "")
+        logger.info(f"Processing text message: '{text}'")
+        if text.strip():
+            await self._generate_response(text)
+        return False
 
-4. **Areas for Improvement**:
-   - List 2-3 things the student could improve
-   - Provide specific suggestions
-
-5. **Key Opportunities Missed**:
-   - Did the student uncover the buyer's pain points? (rust issues, paper costs, shredder damage, employee injuries)
-   - Did they quantify the value/ROI?
-   - Did they ask open-ended questions?
+    async def generate_assessment(self):
+        """Generate a coaching assessment of the student's sales pitch."""
+        history = self.manager.history
 
-6. **One Key Tip**: The single most important thing to focus on next time
+        if len(history) < 2:
+            return None
 
-Keep the feedback constructive and encouraging. Format it nicely for display."""
+        # Build conversation transcript straight from the turns; the display
+        # format (with timestamps) isn't needed here
+        transcript = "\n".join(
+            f"{_ROLE_LABEL[turn.role]}: {turn.text}" for turn in history
+        )
 
-        # Use a fresh Gemini instance for assessment
-        assessment_gemini = GeminiChat(system_prompt="You are an expert sales coach providing constructive feedback.")
+        assessment_prompt = _ASSESSMENT_PROMPT_TEMPLATE.format(transcript=transcript)
 
         try:
-            response = assessment_gemini.send_message(assessment_prompt)
-            return response
+            response = await asyncio.to_thread(
+                _ASSESSMENT_MODEL.generate_content, assessment_prompt
+            )
+            return response.text
         except Exception as e:
             logger.error(f"Error generating assessment: {e}")
             return None
 
 
+# Client message type -> session handler; a truthy result ends the session
+_MESSAGE_HANDLERS = {
+    "stop": ConversationSession.handle_stop,
+    "change_character": ConversationSession.handle_change_character,
+    "text_message": ConversationSession.handle_text_message,
+}
+
+
 @app.websocket("/ws/conversation/{character_id}")
 async def websocket_conversation(websocket: WebSocket, character_id: str):
     """WebSocket endpoint for real-time conversation."""
@@ -294,54 +488,27 @@ async def websocket_conversation(websocket: WebSocket, character_id: str):
         await session.start()
 
         while True:
-            # Receive message from client
             message = await websocket.receive()
-            logger.info(f"Received message type: {message.get('type')}")
-
             if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            # Binary frames carry PCM audio; the browser's Web Speech API
+            # normally handles recognition, so these only arrive from clients
+            # that upload audio
+            if message.get("bytes") is not None:
+                await session.handle_audio_chunk(message["bytes"])
+                continue
+            if message.get("text") is None:
+                continue
+
+            data = orjson.loads(message["text"])
+            msg_type = data.get("type")
+            logger.info(f"Received JSON: {msg_type}")
+
+            handler = _MESSAGE_HANDLERS.get(msg_type)
+            if handler and await handler(session, data):
                 break
 
-            if "bytes" in message:
-                # Ignore audio data - we're using browser's Web Speech API now
-                pass
-
-            elif "text" in message:
-                # JSON message
-                data = json.loads(message["text"])
-                logger.info(f"Received JSON: {data.get('type')}")
-
-                if data.get("type") == "stop":
-                    # Generate assessment before stopping
-                    logger.info("Generating assessment...")
-
-                    assessment = await session.generate_assessment()
-
-                    if assessment:
-                        await session.send_message("assessment", {"text": assessment})
-                        logger.info("Assessment sent to client")
-                    else:
-                        # No assessment (not enough conversation)
-                        await session.send_message("assessment", {"text": "Not enough conversation to generate an assessment. Try having a longer sales conversation next time!"})
-
-                    await session.stop()
-                    break
-
-                elif data.get("type") == "change_character":
-                    new_character_id = data.get("character_id")
-                    character = get_character(new_character_id)
-                    session.character = character
-                    session.gemini.set_character(character.system_prompt)
-                    await session.send_message("character", {
-                        "name": character.name,
-                        "description": character.description,
-                    })
-
-                elif data.get("type") == "text_message":
-                    text = data.get("text", "")
-                    logger.info(f"Processing text message: '{text}'")
-                    if text.strip():
-                        await session._generate_response(text)
-
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
     except Exception as e:
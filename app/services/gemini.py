@@ -1,7 +1,29 @@
+import asyncio
+import threading
 import google.generativeai as genai
 from typing import AsyncGenerator, List, Dict
 from app.config import GOOGLE_API_KEY
 
+GEMINI_MODEL = "gemini-3-pro-preview"
+
+genai.configure(api_key=GOOGLE_API_KEY)
+
+# Models are stateless apart from their system prompt, so sessions share them.
+# Keyed by the (interned) prompt string, whose hash Python caches.
+_MODEL_CACHE: Dict[str, genai.GenerativeModel] = {}
+
+
+def _get_model(system_prompt: str) -> genai.GenerativeModel:
+    """Get a cached model for a system prompt, creating it on first use."""
+    model = _MODEL_CACHE.get(system_prompt)
+    if model is None:
+        model = genai.GenerativeModel(
+            model_name=GEMINI_MODEL,
+            system_instruction=system_prompt,
+        )
+        _MODEL_CACHE[system_prompt] = model
+    return model
+
 
 class GeminiChat:
     """Handles chat interactions with Google Gemini API."""
@@ -13,14 +35,12 @@ class GeminiChat:
         Args:
             system_prompt: The system prompt defining the character/behavior
         """
-        genai.configure(api_key=GOOGLE_API_KEY)
-
-        self.model = genai.GenerativeModel(
-            model_name="gemini-3-pro-preview",
-            system_instruction=system_prompt,
-        )
+        self.model = _get_model(system_prompt)
         self.chat = self.model.start_chat(history=[])
         self.system_prompt = system_prompt
+        # A chat accepts a new message only once the previous response has
+        # been fully read, so worker threads take turns on it
+        self._chat_lock = threading.Lock()
 
     def reset_conversation(self):
         """Reset the conversation history."""
@@ -29,13 +49,10 @@ class GeminiChat:
     def set_character(self, system_prompt: str):
         """Change the character/system prompt and reset conversation."""
         self.system_prompt = system_prompt
-        self.model = genai.GenerativeModel(
-            model_name="gemini-3-pro-preview",
-            system_instruction=system_prompt,
-        )
+        self.model = _get_model(system_prompt)
         self.reset_conversation()
 
-    def send_message(self, message: str) -> str:
+    async def send_message(self, message: str) -> str:
         """
         Send a message and get a response.
 
@@ -45,7 +62,11 @@ class GeminiChat:
         Returns:
             AI's response text
         """
-        response = self.chat.send_message(message)
+        def send():
+            with self._chat_lock:
+                return self.chat.send_message(message)
+
+        response = await asyncio.to_thread(send)
         return response.text
 
     async def send_message_stream(self, message: str) -> AsyncGenerator[str, None]:
@@ -58,11 +79,40 @@ class GeminiChat:
         Yields:
             Chunks of the response text
         """
-        response = self.chat.send_message(message, stream=True)
-
-        for chunk in response:
-            if chunk.text:
-                yield chunk.text
+        # The SDK stream blocks on every chunk, so drain it in a worker thread
+        # and hand chunks back to the event loop through a queue
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                with self._chat_lock:
+                    response = self.chat.send_message(message, stream=True)
+                    for chunk in response:
+                        # Once the consumer is gone keep reading without
+                        # forwarding: an unfinished response would make the
+                        # chat reject every later message
+                        if not stop.is_set() and chunk.text:
+                            loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        loop.run_in_executor(None, produce)
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Stop forwarding if the consumer bailed out
+            stop.set()
 
     def get_history(self) -> List[Dict[str, str]]:
         """Get the conversation history."""
@@ -1,14 +1,119 @@
 import asyncio
+import itertools
+from functools import lru_cache
 from typing import AsyncGenerator, Callable
 from google.cloud import speech
-from app.config import SAMPLE_RATE, STT_LANGUAGE_CODE
+from google.cloud.speech_v1.services.speech.transports import (
+    SpeechGrpcAsyncIOTransport,
+    SpeechGrpcTransport,
+)
+from app.config import (
+    GRPC_CHANNEL_OPTIONS,
+    GRPC_CHANNEL_POOL_SIZE,
+    SAMPLE_RATE,
+    STT_LANGUAGE_CODE,
+    STT_MIN_SEND_BYTES,
+    STT_MAX_BATCH_WAIT,
+    STT_MAX_BUFFER_BYTES,
+    STT_INTERIM_MIN_INTERVAL,
+)
+
+_END_OF_UTTERANCE = speech.StreamingRecognizeResponse.SpeechEventType.END_OF_SINGLE_UTTERANCE
+
+
+@lru_cache(maxsize=1)
+def _stt_clients() -> "itertools.cycle[speech.SpeechAsyncClient]":
+    """Pool of Speech clients, each on its own keepalive channel."""
+    return itertools.cycle([
+        speech.SpeechAsyncClient(
+            transport=SpeechGrpcAsyncIOTransport(
+                channel=SpeechGrpcAsyncIOTransport.create_channel(options=GRPC_CHANNEL_OPTIONS),
+            ),
+        )
+        for _ in range(GRPC_CHANNEL_POOL_SIZE)
+    ])
+
+
+def _stt_client() -> speech.SpeechAsyncClient:
+    """Next shared Speech client; spreads sessions over the channel pool."""
+    return next(_stt_clients())
+
+
+@lru_cache(maxsize=1)
+def sync_stt_client() -> speech.SpeechClient:
+    """Shared blocking Speech client for one-shot recognition, built on first use."""
+    return speech.SpeechClient(
+        transport=SpeechGrpcTransport(
+            channel=SpeechGrpcTransport.create_channel(options=GRPC_CHANNEL_OPTIONS),
+        ),
+    )
+
+
+async def _batched(
+    audio_generator: AsyncGenerator[bytes, None],
+    min_bytes: int = STT_MIN_SEND_BYTES,
+    max_wait: float = STT_MAX_BATCH_WAIT,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Coalesce small audio chunks into larger ones before sending to the API.
+
+    Args:
+        audio_generator: Async generator yielding audio chunks
+        min_bytes: Flush once this many bytes are buffered
+        max_wait: Flush a partial buffer after this many seconds without new audio
+
+    Yields:
+        Batched audio chunks
+    """
+    buffer = bytearray()
+    chunks = audio_generator.__aiter__()
+    next_chunk = None
+
+    try:
+        while True:
+            # Keep one pending read across timeouts; cancelling it would close
+            # the source generator
+            if next_chunk is None:
+                next_chunk = asyncio.ensure_future(chunks.__anext__())
+
+            done, _ = await asyncio.wait({next_chunk}, timeout=max_wait if buffer else None)
+            if not done:
+                # Source went quiet, flush what we have
+                yield bytes(buffer)
+                buffer.clear()
+                continue
+
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            finally:
+                next_chunk = None
+
+            buffer.extend(chunk)
+            if len(buffer) >= min_bytes:
+                yield bytes(buffer)
+                buffer.clear()
+
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        if next_chunk is not None:
+            next_chunk.cancel()
 
 
 class StreamingSpeechToText:
     """Handles streaming speech-to-text using Google Cloud Speech API."""
 
-    def __init__(self):
-        self.client = speech.SpeechClient()
+    def __init__(self, interim_min_interval_s: float = STT_INTERIM_MIN_INTERVAL):
+        """
+        Initialize streaming speech-to-text.
+
+        Args:
+            interim_min_interval_s: Minimum seconds between interim callbacks
+        """
+        self.client = _stt_client()
+        self.interim_min_interval_s = interim_min_interval_s
         self.config = speech.RecognitionConfig(
             encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
             sample_rate_hertz=SAMPLE_RATE,
@@ -34,87 +139,58 @@ class StreamingSpeechToText:
         Args:
             audio_generator: Async generator yielding audio chunks
             on_interim: Callback for interim (partial) transcriptions
-            on_final: Callback for final transcriptions (text, is_end_of_utterance)
+            on_final: Callback for final transcriptions (text, is_end_of_utterance).
+                The server only signals end of utterance in single-utterance
+                mode, so with single_utterance=False the flag is always False.
         """
 
-        def request_generator():
-            # First request must contain the config
+        async def request_iter():
             yield speech.StreamingRecognizeRequest(streaming_config=self.streaming_config)
+            async for chunk in _batched(audio_generator):
+                yield speech.StreamingRecognizeRequest(audio_content=chunk)
 
-            # Create a queue to receive audio chunks from the async generator
-            audio_queue = asyncio.Queue()
-
-            async def fill_queue():
-                async for chunk in audio_generator:
-                    await audio_queue.put(chunk)
-                await audio_queue.put(None)  # Signal end
-
-            # This won't work directly - we need to bridge async and sync
-            # Using a different approach below
-
-        # Bridge async generator to sync for Google's streaming API
-        audio_buffer = []
-        buffer_event = asyncio.Event()
-        stop_flag = False
-
-        async def collect_audio():
-            nonlocal stop_flag
-            async for chunk in audio_generator:
-                if stop_flag:
-                    break
-                audio_buffer.append(chunk)
-                buffer_event.set()
-            stop_flag = True
-            buffer_event.set()
-
-        def sync_audio_generator():
-            yield speech.StreamingRecognizeRequest(streaming_config=self.streaming_config)
+        # Interim results are coalesced: only the latest one in each window
+        # reaches on_interim
+        loop = asyncio.get_running_loop()
+        pending_interim = None
+        flush_handle = None
 
-            while True:
-                if audio_buffer:
-                    chunk = audio_buffer.pop(0)
-                    yield speech.StreamingRecognizeRequest(audio_content=chunk)
-                elif stop_flag:
-                    break
-                else:
-                    # Small sleep to wait for more audio
-                    import time
-                    time.sleep(0.01)
+        def flush_interim():
+            nonlocal pending_interim, flush_handle
+            flush_handle = None
+            if pending_interim is not None:
+                on_interim(pending_interim)
+                pending_interim = None
 
-        # Start collecting audio in background
-        collect_task = asyncio.create_task(collect_audio())
+        # The async client streams natively over gRPC asyncio, so no thread
+        # or sync bridge is needed
+        stream = await self.client.streaming_recognize(requests=request_iter())
 
         try:
-            # Run the streaming recognition in a thread pool
-            loop = asyncio.get_event_loop()
-            responses = await loop.run_in_executor(
-                None,
-                lambda: list(self.client.streaming_recognize(sync_audio_generator()))
-            )
-
-            for response in responses:
+            async for response in stream:
                 for result in response.results:
                     transcript = result.alternatives[0].transcript
 
                     if result.is_final:
+                        # A final result supersedes any interim still waiting
+                        pending_interim = None
                         if on_final:
-                            # Check if this marks end of speech
-                            is_end = (
-                                result.result_end_time is not None and
-                                hasattr(response, 'speech_event_type')
-                            )
+                            # Only set when streaming_config.single_utterance is True
+                            is_end = response.speech_event_type == _END_OF_UTTERANCE
                             on_final(transcript, is_end)
                     else:
                         if on_interim:
-                            on_interim(transcript)
-
+                            pending_interim = transcript
+                            if flush_handle is None:
+                                flush_handle = loop.call_later(
+                                    self.interim_min_interval_s, flush_interim
+                                )
         finally:
-            stop_flag = True
-            collect_task.cancel()
-            try:
-                await collect_task
-            except asyncio.CancelledError:
-                pass
+            if flush_handle is not None:
+                flush_handle.cancel()
+
+        # The stream ended normally: deliver the interim no final replaced
+        flush_interim()
 
 
 class SimpleStreamingSTT:
@@ -123,10 +199,20 @@ class SimpleStreamingSTT:
     Better suited for WebSocket-based real-time processing.
     """
 
-    def __init__(self):
-        self.client = speech.SpeechClient()
+    def __init__(self, interim_min_interval_s: float = STT_INTERIM_MIN_INTERVAL):
+        """
+        Initialize the streaming session.
+
+        Args:
+            interim_min_interval_s: Minimum seconds between interim results
+        """
+        self.client = _stt_client()
+        self.interim_min_interval_s = interim_min_interval_s
         self._stream = None
-        self._audio_queue = asyncio.Queue()
+        # Ping-pong buffers: add_audio fills one while the other is being sent
+        self._fill = bytearray()
+        self._drain = bytearray()
+        self._arrived = asyncio.Event()  # Set by every add_audio and by stop
         self._is_running = False
 
     def get_config(self):
@@ -144,32 +230,54 @@ class SimpleStreamingSTT:
     async def start(self):
         """Start a new streaming session."""
         self._is_running = True
-        self._audio_queue = asyncio.Queue()
+        self._fill.clear()
+        self._drain.clear()
+        self._arrived.clear()
 
     async def stop(self):
         """Stop the streaming session."""
         self._is_running = False
-        await self._audio_queue.put(None)
+        self._arrived.set()
 
     async def add_audio(self, chunk: bytes):
         """Add an audio chunk to be transcribed."""
         if self._is_running:
-            await self._audio_queue.put(chunk)
-
-    def _generate_requests(self):
+            self._fill.extend(chunk)
+            # If the API stalls, drop the oldest audio rather than grow unbounded
+            excess = len(self._fill) - STT_MAX_BUFFER_BYTES
+            if excess > 0:
+                excess += excess & 1  # Keep 16-bit samples aligned
+                del self._fill[:excess]
+            self._arrived.set()
+
+    async def _generate_requests(self):
         """Generate streaming requests for the Speech API."""
         yield speech.StreamingRecognizeRequest(streaming_config=self.get_config())
 
-        while self._is_running:
-            try:
-                # Use a timeout to allow checking is_running
-                chunk = self._audio_queue.get_nowait()
-                if chunk is None:
-                    break
-                yield speech.StreamingRecognizeRequest(audio_content=chunk)
-            except asyncio.QueueEmpty:
-                import time
-                time.sleep(0.01)
+        while True:
+            if self._is_running:
+                # Sleep without a timer until audio arrives
+                if not self._fill:
+                    await self._arrived.wait()
+
+                # Wait for a full batch, or send a partial one once the audio
+                # pauses for STT_MAX_BATCH_WAIT, as in _batched
+                while self._is_running and len(self._fill) < STT_MIN_SEND_BYTES:
+                    self._arrived.clear()
+                    try:
+                        await asyncio.wait_for(self._arrived.wait(), timeout=STT_MAX_BATCH_WAIT)
+                    except asyncio.TimeoutError:
+                        break
+                self._arrived.clear()
+
+            self._fill, self._drain = self._drain, self._fill
+            if self._drain:
+                yield speech.StreamingRecognizeRequest(audio_content=bytes(self._drain))
+                self._drain.clear()
+
+            # add_audio ignores chunks once stopped, so nothing is left to send
+            if not self._is_running:
+                break
 
     async def process_responses(self) -> AsyncGenerator[dict, None]:
         """
@@ -181,26 +289,61 @@ class SimpleStreamingSTT:
                 - is_final: Whether this is a final result
                 - confidence: Confidence score (for final results)
         """
-        loop = asyncio.get_event_loop()
+        # Interim results are coalesced: the latest one in each window is
+        # yielded when the window expires, finals are yielded immediately
+        loop = asyncio.get_running_loop()
+        pending_interim = None
+        deadline = None
+        next_response = None
 
-        def run_streaming():
-            results = []
-            try:
-                responses = self.client.streaming_recognize(self._generate_requests())
-                for response in responses:
-                    for result in response.results:
-                        if result.alternatives:
-                            results.append({
-                                "transcript": result.alternatives[0].transcript,
-                                "is_final": result.is_final,
-                                "confidence": result.alternatives[0].confidence if result.is_final else None,
-                            })
-            except Exception as e:
-                results.append({"error": str(e)})
-            return results
-
-        # Run in thread pool since Google's API is synchronous
-        results = await loop.run_in_executor(None, run_streaming)
-
-        for result in results:
-            yield result
+        try:
+            stream = await self.client.streaming_recognize(requests=self._generate_requests())
+            responses = stream.__aiter__()
+
+            while True:
+                # Keep one pending read across timeouts, as in _batched
+                if next_response is None:
+                    next_response = asyncio.ensure_future(responses.__anext__())
+
+                timeout = None if pending_interim is None else max(0.0, deadline - loop.time())
+                done, _ = await asyncio.wait({next_response}, timeout=timeout)
+                if not done:
+                    yield pending_interim
+                    pending_interim = None
+                    continue
+
+                try:
+                    response = next_response.result()
+                except StopAsyncIteration:
+                    # Deliver the interim no final replaced before ending
+                    if pending_interim is not None:
+                        yield pending_interim
+                    break
+                finally:
+                    next_response = None
+
+                for result in response.results:
+                    if not result.alternatives:
+                        continue
+
+                    if result.is_final:
+                        # A final result supersedes any interim still waiting
+                        pending_interim = None
+                        yield {
+                            "transcript": result.alternatives[0].transcript,
+                            "is_final": True,
+                            "confidence": result.alternatives[0].confidence,
+                        }
+                    else:
+                        if pending_interim is None:
+                            deadline = loop.time() + self.interim_min_interval_s
+                        pending_interim = {
+                            "transcript": result.alternatives[0].transcript,
+                            "is_final": False,
+                            "confidence": None,
+                        }
+        except Exception as e:
+            yield {"error": str(e)}
+        finally:
+            if next_response is not None:
+                next_response.cancel()
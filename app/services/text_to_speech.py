@@ -1,12 +1,163 @@
+import asyncio
+import itertools
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AsyncGenerator, List, Optional, Tuple
 from google.cloud import texttospeech
-from app.config import TTS_LANGUAGE_CODE
+from google.cloud.texttospeech_v1.services.text_to_speech.transports import (
+    TextToSpeechGrpcAsyncIOTransport,
+    TextToSpeechGrpcTransport,
+)
+from app.config import (
+    TTS_LANGUAGE_CODE,
+    TTS_AUDIO_ENCODING,
+    GRPC_CHANNEL_OPTIONS,
+    GRPC_CHANNEL_POOL_SIZE,
+)
+
+# Opus encodes faster and smaller than MP3, cutting time-to-first-audio
+DEFAULT_AUDIO_ENCODING = texttospeech.AudioEncoding[TTS_AUDIO_ENCODING]
+
+# Split text after sentence-ending punctuation or line breaks
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+_GENDER_NAME = {int(gender): gender.name for gender in texttospeech.SsmlVoiceGender}
+
+
+@lru_cache(maxsize=1)
+def _tts_client() -> texttospeech.TextToSpeechClient:
+    """Shared Text-to-Speech client; gRPC channels are thread-safe."""
+    return texttospeech.TextToSpeechClient(
+        transport=TextToSpeechGrpcTransport(
+            channel=TextToSpeechGrpcTransport.create_channel(options=GRPC_CHANNEL_OPTIONS),
+        ),
+    )
+
+
+@lru_cache(maxsize=1)
+def _tts_async_clients() -> "itertools.cycle[texttospeech.TextToSpeechAsyncClient]":
+    """Pool of async Text-to-Speech clients, each on its own keepalive channel."""
+    return itertools.cycle([
+        texttospeech.TextToSpeechAsyncClient(
+            transport=TextToSpeechGrpcAsyncIOTransport(
+                channel=TextToSpeechGrpcAsyncIOTransport.create_channel(options=GRPC_CHANNEL_OPTIONS),
+            ),
+        )
+        for _ in range(GRPC_CHANNEL_POOL_SIZE)
+    ])
+
+
+def _tts_async_client() -> texttospeech.TextToSpeechAsyncClient:
+    """Next shared async Text-to-Speech client for use on the event loop."""
+    return next(_tts_async_clients())
+
+
+@lru_cache(maxsize=128)
+def _make_voice_and_audio(
+    voice_name: str,
+    speaking_rate: float,
+    pitch: float,
+    audio_encoding: texttospeech.AudioEncoding = DEFAULT_AUDIO_ENCODING,
+) -> Tuple[texttospeech.VoiceSelectionParams, texttospeech.AudioConfig]:
+    """Build (and cache) the voice and audio config for a voice preset."""
+    # Extract language code from voice name (e.g., "en-US" from "en-US-Neural2-D")
+    language_code = "-".join(voice_name.split("-", 2)[:2])
+
+    voice = texttospeech.VoiceSelectionParams(
+        language_code=language_code,
+        name=voice_name,
+    )
+
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=audio_encoding,
+        speaking_rate=speaking_rate,
+        pitch=pitch,
+    )
+
+    return voice, audio_config
+
+
+@lru_cache(maxsize=16)
+def _voice_catalog(language_code: str) -> Tuple[Tuple[str, str, int], ...]:
+    """Fetch (and cache) the (name, gender, sample rate) of each voice."""
+    response = _tts_client().list_voices(language_code=language_code)
+
+    return tuple(
+        (voice.name, _GENDER_NAME[int(voice.ssml_gender)], voice.natural_sample_rate_hertz)
+        for voice in response.voices
+    )
+
+
+def list_voices(language_code: str = "en-US") -> list:
+    """
+    List available voices for a language.
+
+    The voice catalog doesn't change while the app runs, so it is cached per
+    language and each call gets a fresh list; call list_voices.cache_clear()
+    to refresh.
+
+    Returns:
+        List of voice names
+    """
+    return [
+        {"name": name, "gender": gender, "natural_sample_rate": rate}
+        for name, gender, rate in _voice_catalog(language_code)
+    ]
+
+
+list_voices.cache_clear = _voice_catalog.cache_clear
+
+
+class _AudioCache:
+    """Bounded LRU cache of synthesized audio, safe to share across threads."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.stats = {"hits": 0, "misses": 0}
+        self._data: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text, voice_name, speaking_rate, pitch, audio_encoding) -> tuple:
+        return (text, voice_name, round(speaking_rate, 2), round(pitch, 1), audio_encoding)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        if not self.maxsize:
+            return None
+        with self._lock:
+            audio = self._data.get(key)
+            if audio is None:
+                self.stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats["hits"] += 1
+            return audio
+
+    def put(self, key: tuple, audio: bytes):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = audio
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
 
 
 class TextToSpeech:
     """Handles text-to-speech using Google Cloud Text-to-Speech API."""
 
-    def __init__(self):
-        self.client = texttospeech.TextToSpeechClient()
+    def __init__(self, cache_size: int = 256):
+        """
+        Initialize text-to-speech.
+
+        Args:
+            cache_size: Number of synthesized clips to keep in memory (0 disables caching)
+        """
+        self.client = _tts_client()
+        self._cache = _AudioCache(cache_size)
+        self.stats = self._cache.stats
 
     def synthesize(
         self,
@@ -14,6 +165,7 @@ class TextToSpeech:
         voice_name: str = "en-US-Neural2-D",
         speaking_rate: float = 1.0,
         pitch: float = 0.0,
+        audio_encoding: texttospeech.AudioEncoding = DEFAULT_AUDIO_ENCODING,
     ) -> bytes:
         """
         Convert text to speech audio.
@@ -23,24 +175,20 @@ class TextToSpeech:
             voice_name: Google TTS voice name (e.g., "en-US-Neural2-D")
             speaking_rate: Speed of speech (0.25 to 4.0, default 1.0)
             pitch: Voice pitch (-20.0 to 20.0, default 0.0)
+            audio_encoding: Output encoding (default OGG Opus)
 
         Returns:
-            Audio content as bytes (MP3 format)
+            Audio content as bytes (OGG Opus by default)
         """
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-
-        # Extract language code from voice name (e.g., "en-US" from "en-US-Neural2-D")
-        language_code = "-".join(voice_name.split("-")[:2])
+        cache_key = _AudioCache.key(text, voice_name, speaking_rate, pitch, audio_encoding)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        voice = texttospeech.VoiceSelectionParams(
-            language_code=language_code,
-            name=voice_name,
-        )
+        synthesis_input = texttospeech.SynthesisInput(text=text)
 
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=speaking_rate,
-            pitch=pitch,
+        voice, audio_config = _make_voice_and_audio(
+            voice_name, speaking_rate, pitch, audio_encoding
         )
 
         response = self.client.synthesize_speech(
@@ -49,6 +197,7 @@ class TextToSpeech:
             audio_config=audio_config,
         )
 
+        self._cache.put(cache_key, response.audio_content)
         return response.audio_content
 
     def synthesize_ssml(
@@ -57,6 +206,7 @@ class TextToSpeech:
         voice_name: str = "en-US-Neural2-D",
         speaking_rate: float = 1.0,
         pitch: float = 0.0,
+        audio_encoding: texttospeech.AudioEncoding = DEFAULT_AUDIO_ENCODING,
     ) -> bytes:
         """
         Convert SSML to speech audio for more control over pronunciation.
@@ -66,27 +216,40 @@ class TextToSpeech:
             voice_name: Google TTS voice name
             speaking_rate: Speed of speech
             pitch: Voice pitch
+            audio_encoding: Output encoding
 
         Returns:
-            Audio content as bytes (MP3 format)
+            Audio content as bytes (OGG Opus by default)
         """
         synthesis_input = texttospeech.SynthesisInput(ssml=ssml)
 
-        language_code = "-".join(voice_name.split("-")[:2])
-
-        voice = texttospeech.VoiceSelectionParams(
-            language_code=language_code,
-            name=voice_name,
+        voice, audio_config = _make_voice_and_audio(
+            voice_name, speaking_rate, pitch, audio_encoding
         )
 
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=speaking_rate,
-            pitch=pitch,
+        response = self.client.synthesize_speech(
+            input=synthesis_input,
+            voice=voice,
+            audio_config=audio_config,
         )
 
+        return response.audio_content
+
+    def synthesize_preset(self, text: str, preset: str = "default") -> bytes:
+        """
+        Convert text to speech using one of VOICE_PRESETS.
+
+        Args:
+            text: The text to convert to speech
+            preset: Name of the voice preset
+
+        Returns:
+            Audio content as bytes (OGG Opus)
+        """
+        voice, audio_config = VOICE_PRESETS[preset]
+
         response = self.client.synthesize_speech(
-            input=synthesis_input,
+            input=texttospeech.SynthesisInput(text=text),
             voice=voice,
             audio_config=audio_config,
         )
@@ -101,22 +264,159 @@ class TextToSpeech:
         Returns:
             List of voice names
         """
-        client = texttospeech.TextToSpeechClient()
-        response = client.list_voices(language_code=language_code)
+        return list_voices(language_code)
+
+
+class AsyncTextToSpeech:
+    """Handles text-to-speech on the event loop using the async Google client."""
+
+    def __init__(self, cache_size: int = 256):
+        """
+        Initialize async text-to-speech.
+
+        Args:
+            cache_size: Number of synthesized clips to keep in memory (0 disables caching)
+        """
+        self._cache = _AudioCache(cache_size)
+        self.stats = self._cache.stats
+
+    @property
+    def client(self) -> texttospeech.TextToSpeechAsyncClient:
+        # Picked per call: spreads requests over the channel pool, and the pool
+        # is only created once the event loop is running
+        return _tts_async_client()
+
+    async def synthesize(
+        self,
+        text: str,
+        voice_name: str = "en-US-Neural2-D",
+        speaking_rate: float = 1.0,
+        pitch: float = 0.0,
+        audio_encoding: texttospeech.AudioEncoding = DEFAULT_AUDIO_ENCODING,
+    ) -> bytes:
+        """
+        Convert text to speech audio without blocking the event loop.
+
+        Args:
+            text: The text to convert to speech
+            voice_name: Google TTS voice name (e.g., "en-US-Neural2-D")
+            speaking_rate: Speed of speech (0.25 to 4.0, default 1.0)
+            pitch: Voice pitch (-20.0 to 20.0, default 0.0)
+            audio_encoding: Output encoding (default OGG Opus)
+
+        Returns:
+            Audio content as bytes (OGG Opus by default)
+        """
+        cache_key = _AudioCache.key(text, voice_name, speaking_rate, pitch, audio_encoding)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        voices = []
-        for voice in response.voices:
-            voices.append({
-                "name": voice.name,
-                "gender": texttospeech.SsmlVoiceGender(voice.ssml_gender).name,
-                "natural_sample_rate": voice.natural_sample_rate_hertz,
-            })
+        synthesis_input = texttospeech.SynthesisInput(text=text)
 
-        return voices
+        voice, audio_config = _make_voice_and_audio(
+            voice_name, speaking_rate, pitch, audio_encoding
+        )
+
+        response = await self.client.synthesize_speech(
+            input=synthesis_input,
+            voice=voice,
+            audio_config=audio_config,
+        )
+
+        self._cache.put(cache_key, response.audio_content)
+        return response.audio_content
+
+    async def synthesize_preset(self, text: str, preset: str = "default") -> bytes:
+        """
+        Convert text to speech using one of VOICE_PRESETS.
+
+        Args:
+            text: The text to convert to speech
+            preset: Name of the voice preset
+
+        Returns:
+            Audio content as bytes (OGG Opus)
+        """
+        voice, audio_config = VOICE_PRESETS[preset]
+
+        response = await self.client.synthesize_speech(
+            input=texttospeech.SynthesisInput(text=text),
+            voice=voice,
+            audio_config=audio_config,
+        )
+
+        return response.audio_content
+
+    async def synthesize_parallel(
+        self,
+        chunks: List[str],
+        voice_name: str = "en-US-Neural2-D",
+        speaking_rate: float = 1.0,
+        pitch: float = 0.0,
+        audio_encoding: texttospeech.AudioEncoding = DEFAULT_AUDIO_ENCODING,
+    ) -> List[bytes]:
+        """
+        Convert several pieces of text to speech concurrently.
+
+        Args:
+            chunks: Texts to convert, e.g. sentences of a longer reply
+            voice_name: Google TTS voice name
+            speaking_rate: Speed of speech
+            pitch: Voice pitch
+            audio_encoding: Output encoding
+
+        Returns:
+            Audio content for each chunk, in the same order
+        """
+        return await asyncio.gather(*(
+            self.synthesize(chunk, voice_name, speaking_rate, pitch, audio_encoding)
+            for chunk in chunks
+        ))
+
+    async def synthesize_long(
+        self,
+        text: str,
+        voice_name: str = "en-US-Neural2-D",
+        speaking_rate: float = 1.0,
+        pitch: float = 0.0,
+        audio_encoding: texttospeech.AudioEncoding = DEFAULT_AUDIO_ENCODING,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Convert long text to speech, streaming audio sentence by sentence.
+
+        All sentences are synthesized concurrently, and each clip is yielded
+        in order as soon as it and everything before it are ready.
+
+        Args:
+            text: The text to convert to speech
+            voice_name: Google TTS voice name
+            speaking_rate: Speed of speech
+            pitch: Voice pitch
+            audio_encoding: Output encoding
+
+        Yields:
+            Audio content for each sentence, in order
+        """
+        sentences = [s for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+        tasks = [
+            asyncio.create_task(
+                self.synthesize(sentence, voice_name, speaking_rate, pitch, audio_encoding)
+            )
+            for sentence in sentences
+        ]
+
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            # Don't leave synthesis running if the consumer stops early
+            for task in tasks:
+                task.cancel()
 
 
 # Pre-configured voice options for characters
-VOICE_PRESETS = {
+_RAW_PRESETS = {
     "wizard": {
         "voice_name": "en-US-Neural2-D",  # Deep male voice
         "speaking_rate": 0.9,
@@ -138,3 +438,9 @@ VOICE_PRESETS = {
         "pitch": 0.0,
     },
 }
+
+# Presets resolved to ready-made (voice, audio_config) protos at import time
+VOICE_PRESETS = {
+    name: _make_voice_and_audio(**preset)
+    for name, preset in _RAW_PRESETS.items()
+}
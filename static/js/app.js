@@ -1,3 +1,6 @@
+// Binary frames from the server start with a one-byte type tag
+const AUDIO_FRAME_TAG = 0x01;
+
 class RolePlayApp {
     constructor() {
         // DOM elements
@@ -20,6 +23,8 @@ class RolePlayApp {
         this.recognition = null;
         this.isRunning = false;
         this.isListening = false;
+        this.audioQueue = [];
+        this.isPlayingAudio = false;
 
         // Character emoji mapping
         this.characterEmojis = {
@@ -170,6 +175,7 @@ class RolePlayApp {
             const characterId = this.characterSelect.value;
             const wsUrl = `ws://${window.location.host}/ws/conversation/${characterId}`;
             this.websocket = new WebSocket(wsUrl);
+            this.websocket.binaryType = 'arraybuffer';
 
             this.websocket.onopen = () => {
                 this.isRunning = true;
@@ -253,12 +259,20 @@ class RolePlayApp {
     }
 
     handleMessage(event) {
+        if (event.data instanceof ArrayBuffer) {
+            this.handleBinaryMessage(event.data);
+            return;
+        }
+
         const data = JSON.parse(event.data);
 
         switch (data.type) {
             case 'state':
                 if (data.state === 'listening' && this.isRunning) {
-                    this.startListening();
+                    // Queued audio resumes listening once it has finished playing
+                    if (!this.isPlayingAudio) {
+                        this.startListening();
+                    }
                 } else {
                     this.setStatus(data.state);
                 }
@@ -281,10 +295,6 @@ class RolePlayApp {
                 this.addMessage('assistant', data.text);
                 break;
 
-            case 'audio':
-                this.playAudio(data.audio);
-                break;
-
             case 'character':
                 this.characterName.textContent = data.name;
                 this.characterDescription.textContent = data.description;
@@ -292,6 +302,7 @@ class RolePlayApp {
 
             case 'interrupted':
                 // Stop current audio playback
+                this.clearAudioQueue();
                 this.audioPlayer.pause();
                 this.audioPlayer.currentTime = 0;
                 this.startListening();
@@ -320,6 +331,13 @@ class RolePlayApp {
         }
     }
 
+    handleBinaryMessage(buffer) {
+        const frame = new Uint8Array(buffer);
+        if (frame[0] === AUDIO_FRAME_TAG) {
+            this.enqueueAudio(frame.subarray(1));
+        }
+    }
+
     showAssessment(text) {
         // Create assessment container
         const assessmentDiv = document.createElement('div');
@@ -343,22 +361,42 @@ class RolePlayApp {
         this.transcriptArea.scrollTop = this.transcriptArea.scrollHeight;
     }
 
-    playAudio(base64Audio) {
-        console.log('Playing audio, length:', base64Audio.length);
+    enqueueAudio(audioBytes) {
+        // Responses arrive sentence by sentence; play them back in order
+        this.audioQueue.push(audioBytes);
+        if (!this.isPlayingAudio) {
+            this.playNextAudio();
+        }
+    }
+
+    playNextAudio() {
+        const next = this.audioQueue.shift();
+        if (next === undefined) {
+            this.isPlayingAudio = false;
+            // Resume listening after all queued audio finishes
+            if (this.isRunning) {
+                this.startListening();
+            }
+            return;
+        }
+
+        this.isPlayingAudio = true;
+        this.playAudio(next);
+    }
+
+    clearAudioQueue() {
+        this.audioQueue = [];
+        this.isPlayingAudio = false;
+    }
+
+    playAudio(audioBytes) {
+        console.log('Playing audio, length:', audioBytes.length);
 
         // Stop listening while playing audio
         this.stopListening();
 
         try {
-            const audioData = atob(base64Audio);
-            const arrayBuffer = new ArrayBuffer(audioData.length);
-            const view = new Uint8Array(arrayBuffer);
-
-            for (let i = 0; i < audioData.length; i++) {
-                view[i] = audioData.charCodeAt(i);
-            }
-
-            const blob = new Blob([arrayBuffer], { type: 'audio/mp3' });
+            const blob = new Blob([audioBytes], { type: 'audio/ogg; codecs=opus' });
             const audioUrl = URL.createObjectURL(blob);
 
             console.log('Audio blob created, size:', blob.size);
@@ -380,6 +418,7 @@ class RolePlayApp {
                     document.addEventListener('click', () => {
                         this.audioPlayer.play();
                     }, { once: true });
+                    this.clearAudioQueue();
                     this.startListening();
                 });
             }
@@ -387,20 +426,17 @@ class RolePlayApp {
             this.audioPlayer.onended = () => {
                 console.log('Audio playback ended');
                 URL.revokeObjectURL(audioUrl);
-                // Resume listening after audio finishes
-                if (this.isRunning) {
-                    this.startListening();
-                }
+                this.playNextAudio();
             };
 
             this.audioPlayer.onerror = (e) => {
                 console.error('Audio error:', e);
-                this.startListening();
+                this.playNextAudio();
             };
 
         } catch (error) {
             console.error('Error in playAudio:', error);
-            this.startListening();
+            this.playNextAudio();
         }
     }
 
@@ -425,6 +461,7 @@ class RolePlayApp {
         this.stopListening();
 
         // Stop audio playback
+        this.clearAudioQueue();
         this.audioPlayer.pause();
         this.audioPlayer.currentTime = 0;
 
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+pytest.importorskip("dotenv")
+
+from app.services.gemini import GeminiChat
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeChat:
+    """Mimics ChatSession rejecting new messages while a response is unfinished."""
+
+    def __init__(self, chunks, hold_after_first=None):
+        self.chunks = chunks
+        self.hold_after_first = hold_after_first
+        self.incomplete = False
+        self.sent = []
+
+    def send_message(self, message, stream=False):
+        if self.incomplete:
+            raise RuntimeError("previous response was not fully iterated")
+        self.sent.append(message)
+        self.incomplete = True
+        return self._stream()
+
+    def _stream(self):
+        for i, text in enumerate(self.chunks):
+            yield _Chunk(text)
+            if i == 0 and self.hold_after_first is not None:
+                self.hold_after_first.wait(timeout=5)
+        self.incomplete = False
+
+
+def _make_chat(chat):
+    gemini = GeminiChat.__new__(GeminiChat)
+    gemini.chat = chat
+    gemini.system_prompt = None
+    gemini._chat_lock = threading.Lock()
+    return gemini
+
+
+def test_next_turn_succeeds_after_interrupted_stream():
+    release = threading.Event()
+    gemini = _make_chat(_FakeChat(["Hello ", "there, ", "traveler."], release))
+
+    async def consume(message, received):
+        async for chunk in gemini.send_message_stream(message):
+            received.append(chunk)
+
+    async def main():
+        # Interrupt the first turn mid-stream, as a barge-in does
+        first = []
+        stream_task = asyncio.create_task(consume("first", first))
+        while not first:
+            await asyncio.sleep(0.01)
+        stream_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await stream_task
+        release.set()
+
+        gemini.chat.hold_after_first = None
+        second = []
+        await consume("second", second)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == ["Hello "]
+    assert "".join(second) == "Hello there, traveler."
+    assert gemini.chat.sent == ["first", "second"]